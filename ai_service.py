@@ -1,32 +1,157 @@
+import asyncio
+import hashlib
+import os
 import re
-from typing import Optional, Tuple
+import shutil
+import tempfile
+import threading
+from collections import Counter, OrderedDict
+from pathlib import Path
+from random import randrange
+from typing import Dict, List, Optional, Tuple
+import ahocorasick
 import cohere
+import numpy as np
 from transformers import pipeline
 from config import settings
 
 
+SENTIMENT_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+
+# Inputs per forward pass for the local sentiment model
+SENTIMENT_BATCH_SIZE = 32
+
+# Cohere's classify endpoint accepts at most 96 inputs per call
+COHERE_CLASSIFY_BATCH_SIZE = 96
+
+SENTIMENT_EXAMPLES = [
+    cohere.ClassifyExample(text="Great service! Loved it!", label="positive"),
+    cohere.ClassifyExample(text="Amazing experience, will come back", label="positive"),
+    cohere.ClassifyExample(text="Terrible service, very disappointed", label="negative"),
+    cohere.ClassifyExample(text="Worst experience ever", label="negative"),
+    cohere.ClassifyExample(text="It was okay, nothing special", label="neutral"),
+]
+
+TOPIC_KEYWORDS = {
+    'service': ['service', 'staff', 'waiter', 'waitress', 'employee', 'friendly', 'rude', 'helpful', 'slow'],
+    'cleanliness': ['clean', 'dirty', 'hygiene', 'sanitary', 'mess', 'spotless', 'filthy'],
+    'price': ['price', 'expensive', 'cheap', 'cost', 'value', 'overpriced', 'affordable', 'worth'],
+    'food': ['food', 'meal', 'dish', 'taste', 'delicious', 'bland', 'fresh', 'stale', 'menu'],
+    'ambiance': ['atmosphere', 'ambiance', 'decor', 'music', 'loud', 'quiet', 'cozy', 'comfortable']
+}
+
+KEYWORD_TOPICS = {keyword: topic for topic, keywords in TOPIC_KEYWORDS.items() for keyword in keywords}
+
+# Keywords for the fallback sentiment classifier
+POSITIVE_WORDS = frozenset(['great', 'excellent', 'amazing', 'wonderful', 'love', 'best', 'fantastic', 'awesome'])
+NEGATIVE_WORDS = frozenset(['bad', 'terrible', 'worst', 'awful', 'horrible', 'poor', 'disappointing', 'hate'])
+
+
+def _build_keyword_automaton(keywords) -> ahocorasick.Automaton:
+    """Build an Aho-Corasick automaton that reports each keyword it finds."""
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+TOPIC_AUTOMATON = _build_keyword_automaton(KEYWORD_TOPICS)
+SENTIMENT_AUTOMATON = _build_keyword_automaton(POSITIVE_WORDS | NEGATIVE_WORDS)
+
+
+def _text_key(text: str) -> int:
+    """64-bit hash of text used as the AI result cache key."""
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), 'big')
+
+
 class AIService:
     """Service for AI-powered features (sentiment analysis, reply generation)."""
     
+    # Sensitive information redacted from reviews before reply generation
+    _EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+    _PHONE1_RE = re.compile(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b')
+    _PHONE2_RE = re.compile(r'\b\(\d{3}\)\s*\d{3}[-.]?\d{4}\b')
+    _SENSITIVE_RE = re.compile(
+        f'(?P<email>{_EMAIL_RE.pattern})|(?P<phone>{_PHONE1_RE.pattern}|{_PHONE2_RE.pattern})'
+    )
+    
     def __init__(self):
         """Initialize AI service with Cohere or local models."""
         self.use_local = settings.use_local_model or not settings.cohere_api_key
         
         if not self.use_local and settings.cohere_api_key:
             try:
-                self.cohere_client = cohere.Client(settings.cohere_api_key)
+                self.cohere_async = cohere.AsyncClient(settings.cohere_api_key)
                 print("✓ Using Cohere API for AI features")
             except Exception as e:
                 print(f"⚠ Cohere initialization failed: {e}. Falling back to local models.")
                 self.use_local = True
         
-        if self.use_local:
+        self._sentiment_cache = OrderedDict()
+        self._topic_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
+        # Template-based responses for local reply generation
+        self._templates = {
+            'positive': (
+                "Thank you so much for your wonderful feedback! We're thrilled to hear you had a great experience. We look forward to welcoming you back soon!",
+                "We're so glad you enjoyed your visit! Your kind words mean a lot to our team. Hope to see you again!",
+            ),
+            'negative': (
+                "We sincerely apologize for your disappointing experience. This is not the standard we aim for. Please contact us directly so we can make this right.",
+                "Thank you for bringing this to our attention. We're truly sorry for falling short of your expectations and would like the opportunity to improve your experience.",
+            ),
+            'neutral': (
+                "Thank you for taking the time to share your feedback. We appreciate your comments and are always working to improve. We hope to serve you better next time!",
+            ),
+        }
+        
+        # Bounds in-flight Cohere requests when a batch fans out
+        self._cohere_semaphore = asyncio.Semaphore(settings.cohere_max_concurrency)
+        
+        # Micro-batching queue for single sentiment requests (see start_batcher)
+        self._queue: Optional[asyncio.Queue] = None
+        self._batcher_task: Optional[asyncio.Task] = None
+        
+        # Local models are loaded by load_models(), once per worker process
+        self.sentiment_session = None
+        self.sentiment_tokenizer = None
+        self.sentiment_analyzer = None
+        self.summarizer = None
+        self._models_loaded = False
+        self.num_threads = 1
+        self._models_lock = threading.Lock()
+    
+    def load_models(self):
+        """
+        Load local models if they are in use.
+        
+        Called from the app lifespan so each uvicorn worker loads its own
+        copy after startup instead of at import; otherwise models load on
+        first use. Safe to call more than once.
+        """
+        with self._models_lock:
+            if self._models_loaded or not self.use_local:
+                return
+            self._models_loaded = True
+            
+            self._configure_threads()
+            
             print("✓ Using local transformers models for AI features")
             try:
-                self.sentiment_analyzer = pipeline(
-                    "sentiment-analysis",
-                    model="distilbert-base-uncased-finetuned-sst-2-english"
-                )
+                self._load_quantized_sentiment_model()
+                print("✓ Using INT8 ONNX Runtime sentiment model")
+            except Exception as e:
+                print(f"⚠ ONNX sentiment model unavailable: {e}. Using transformers pipeline.")
+            
+            try:
+                if self.sentiment_session is None:
+                    self.sentiment_analyzer = pipeline(
+                        "sentiment-analysis",
+                        model=SENTIMENT_MODEL
+                    )
+                    self.sentiment_tokenizer = self.sentiment_analyzer.tokenizer
                 self.summarizer = pipeline(
                     "summarization",
                     model="facebook/bart-large-cnn"
@@ -36,45 +161,305 @@ class AIService:
                 self.sentiment_analyzer = None
                 self.summarizer = None
     
-    def analyze_sentiment(self, text: str) -> str:
+    def _configure_threads(self):
+        """
+        Limit inference threads so uvicorn workers don't oversubscribe the CPU.
+        
+        Each worker gets its share of the cores (or settings.inference_threads).
+        Fewer threads per worker means slightly slower single requests but
+        much higher throughput when all workers are busy.
+        """
+        self.num_threads = settings.inference_threads or max(1, (os.cpu_count() or 1) // settings.workers)
+        
+        # Tokenizers must not fork their own thread pool inside each worker
+        os.environ["TOKENIZERS_PARALLELISM"] = "false"
+        
+        try:
+            import torch
+            torch.set_num_threads(self.num_threads)
+        except ImportError:
+            pass
+    
+    async def warmup(self):
+        """Run one dummy inference so the first real request doesn't pay cold-start costs."""
+        if self.use_local and (self.sentiment_session or self.sentiment_analyzer):
+            await asyncio.to_thread(self._analyze_sentiment_local, ["warmup"])
+    
+    def _load_quantized_sentiment_model(self):
+        """
+        Load the sentiment model as a dynamically quantized INT8 ONNX graph.
+        
+        The model is exported and quantized on first use and cached in
+        settings.onnx_model_dir, so later startups only load the .onnx file.
+        """
+        import onnxruntime as ort
+        from transformers import AutoConfig, AutoTokenizer
+        
+        model_dir = Path(settings.onnx_model_dir)
+        quantized_path = model_dir / "model_quantized.onnx"
+        
+        if not quantized_path.exists():
+            self._export_quantized_sentiment_model(model_dir)
+        
+        config = AutoConfig.from_pretrained(model_dir)
+        self.sentiment_labels = [config.id2label[i] for i in range(config.num_labels)]
+        self.sentiment_tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        session_options = ort.SessionOptions()
+        session_options.intra_op_num_threads = self.num_threads
+        session_options.inter_op_num_threads = 1
+        self.sentiment_session = ort.InferenceSession(
+            str(quantized_path),
+            sess_options=session_options,
+            providers=["CPUExecutionProvider"]
+        )
+    
+    def _export_quantized_sentiment_model(self, model_dir: Path):
+        """
+        Export and quantize the sentiment model into model_dir.
+        
+        Everything is written to a temp dir next to model_dir, which is then
+        renamed into place, so a crash or a concurrent worker never leaves a
+        half-written model behind. If another worker finishes first, its
+        copy is kept.
+        """
+        from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        from transformers import AutoTokenizer
+        
+        model_dir.parent.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f".{model_dir.name}-", dir=model_dir.parent))
+        try:
+            model = ORTModelForSequenceClassification.from_pretrained(SENTIMENT_MODEL, export=True)
+            model.save_pretrained(tmp_dir)
+            AutoTokenizer.from_pretrained(SENTIMENT_MODEL).save_pretrained(tmp_dir)
+            
+            quantizer = ORTQuantizer.from_pretrained(model)
+            quantizer.quantize(
+                save_dir=tmp_dir,
+                quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+            )
+            
+            # Clear out an incomplete export left by an older version
+            if model_dir.exists() and not (model_dir / "model_quantized.onnx").exists():
+                shutil.rmtree(model_dir, ignore_errors=True)
+            try:
+                os.rename(tmp_dir, model_dir)
+            except OSError:
+                if not (model_dir / "model_quantized.onnx").exists():
+                    raise
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    
+    def _run_sentiment_model(self, texts: List[str]) -> List[dict]:
+        """Run one batch through the local sentiment model."""
+        if self.sentiment_session is None:
+            return self.sentiment_analyzer(
+                texts,
+                batch_size=len(texts),
+                truncation=True,
+                max_length=512
+            )
+        
+        encodings = self.sentiment_tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=512,
+            return_tensors="np"
+        )
+        inputs = {
+            model_input.name: encodings[model_input.name].astype(np.int64)
+            for model_input in self.sentiment_session.get_inputs()
+        }
+        logits = self.sentiment_session.run(None, inputs)[0]
+        
+        # Softmax over the label dimension
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        probs = exp / exp.sum(axis=1, keepdims=True)
+        best = probs.argmax(axis=1)
+        
+        return [
+            {'label': self.sentiment_labels[label], 'score': float(probs[row, label])}
+            for row, label in enumerate(best)
+        ]
+    
+    async def analyze_sentiment(self, text: str, fallback: bool = True) -> Optional[str]:
         """
         Analyze sentiment of text.
         
-        Returns: 'positive', 'negative', or 'neutral'
+        While the batcher is running, concurrent calls are coalesced into a
+        single model batch.
+        
+        Args:
+            text: Text to analyze
+            fallback: Use keyword matching if the model or API fails;
+                otherwise return None in that case
+        
+        Returns: 'positive', 'negative', or 'neutral' (None if the model
+        failed and fallback is False)
         """
-        if self.use_local and self.sentiment_analyzer:
+        if self._queue is None:
+            return (await self.analyze_sentiment_batch([text], fallback=fallback))[0]
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        sentiment = await future
+        if sentiment is None and fallback:
+            return self._fallback_sentiment(text)
+        return sentiment
+    
+    def start_batcher(self):
+        """Start the background task that batches analyze_sentiment calls."""
+        self._queue = asyncio.Queue()
+        self._batcher_task = asyncio.create_task(self._batch_worker())
+    
+    async def stop_batcher(self):
+        """Stop the batching task; pending calls are cancelled and later calls run unbatched."""
+        if self._batcher_task is not None:
+            self._batcher_task.cancel()
             try:
-                result = self.sentiment_analyzer(text[:512])[0]
-                label = result['label'].lower()
-                score = result['score']
+                await self._batcher_task
+            except asyncio.CancelledError:
+                pass
+        self._queue = None
+        self._batcher_task = None
+    
+    async def _batch_worker(self):
+        """Collect queued texts for up to sentiment_batch_wait_ms and run them as one batch."""
+        loop = asyncio.get_running_loop()
+        wait = settings.sentiment_batch_wait_ms / 1000
+        batch = []
+        
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                deadline = loop.time() + wait
+                while len(batch) < SENTIMENT_BATCH_SIZE:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
                 
-                # Map to our categories
-                if label == 'positive' and score > 0.6:
-                    return 'positive'
-                elif label == 'negative' and score > 0.6:
-                    return 'negative'
-                else:
-                    return 'neutral'
-            except Exception as e:
-                print(f"Sentiment analysis error: {e}")
-                return self._fallback_sentiment(text)
+                try:
+                    sentiments = await self.analyze_sentiment_batch([text for text, _ in batch], fallback=False)
+                except Exception as e:
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                
+                for (_, future), sentiment in zip(batch, sentiments):
+                    if not future.done():
+                        future.set_result(sentiment)
+        finally:
+            # Stopped: cancel the in-flight batch and anything still queued so
+            # no caller waits forever
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            for _, future in batch:
+                if not future.done():
+                    future.cancel()
+    
+    async def analyze_sentiment_batch(self, texts: List[str], fallback: bool = True) -> List[Optional[str]]:
+        """
+        Analyze sentiment of many texts at once.
+        
+        Previously seen texts are answered from cache; the rest run through
+        the model together. Only model/API results are cached, so texts hit
+        by an outage are retried on the next call.
+        
+        Args:
+            texts: Texts to analyze
+            fallback: Use keyword matching for texts the model or API failed
+                on; otherwise leave None for them
+        
+        Returns: list of 'positive', 'negative', or 'neutral' in input order
+        """
+        keys, results, missing = self._cache_lookup(self._sentiment_cache, texts)
+        computed = await self._analyze_sentiment_uncached(list(missing.values())) if missing else []
+        sentiments = self._cache_store(self._sentiment_cache, keys, results, dict(zip(missing, computed)))
+        
+        if fallback:
+            sentiments = [
+                self._fallback_sentiment(text) if sentiment is None else sentiment
+                for text, sentiment in zip(texts, sentiments)
+            ]
+        return sentiments
+    
+    async def _analyze_sentiment_uncached(self, texts: List[str]) -> List[Optional[str]]:
+        """Run sentiment analysis for texts without consulting the cache; None where it failed."""
+        if self.use_local and not self._models_loaded:
+            await asyncio.to_thread(self.load_models)
+        
+        if self.use_local and (self.sentiment_session or self.sentiment_analyzer):
+            # Model inference is CPU-bound; run it off the event loop
+            return await asyncio.to_thread(self._analyze_sentiment_local, texts)
+        elif self.use_local:
+            # No local model could be loaded, so keyword matching is the classifier
+            return [self._fallback_sentiment(text) for text in texts]
         else:
-            # Use Cohere
+            # Use Cohere, classifying chunks concurrently
             try:
-                response = self.cohere_client.classify(
-                    inputs=[text],
-                    examples=[
-                        cohere.ClassifyExample(text="Great service! Loved it!", label="positive"),
-                        cohere.ClassifyExample(text="Amazing experience, will come back", label="positive"),
-                        cohere.ClassifyExample(text="Terrible service, very disappointed", label="negative"),
-                        cohere.ClassifyExample(text="Worst experience ever", label="negative"),
-                        cohere.ClassifyExample(text="It was okay, nothing special", label="neutral"),
-                    ]
-                )
-                return response.classifications[0].prediction
+                chunks = await asyncio.gather(*(
+                    self._classify_with_cohere(texts[start:start + COHERE_CLASSIFY_BATCH_SIZE])
+                    for start in range(0, len(texts), COHERE_CLASSIFY_BATCH_SIZE)
+                ))
+                return [sentiment for chunk in chunks for sentiment in chunk]
             except Exception as e:
                 print(f"Cohere sentiment error: {e}")
-                return self._fallback_sentiment(text)
+                return [None] * len(texts)
+    
+    def _analyze_sentiment_local(self, texts: List[str]) -> List[Optional[str]]:
+        """
+        Run sentiment analysis with the local model.
+        
+        Texts run in buckets of similar token length so each batch pads only
+        to its own longest input. Returns None for every text if the model fails.
+        """
+        try:
+            truncated = [text[:512] for text in texts]
+            
+            # Sort by token length and run one bucket at a time
+            encodings = self.sentiment_tokenizer(truncated, truncation=True, max_length=512)
+            lengths = np.array([len(ids) for ids in encodings['input_ids']])
+            order = np.argsort(lengths, kind='stable')
+            
+            results = []
+            for start in range(0, len(order), SENTIMENT_BATCH_SIZE):
+                bucket = [truncated[i] for i in order[start:start + SENTIMENT_BATCH_SIZE]]
+                results.extend(self._run_sentiment_model(bucket))
+            
+            # Undo the sort
+            inverse = np.empty_like(order)
+            inverse[order] = np.arange(len(order))
+            return [self._map_sentiment_label(results[i]) for i in inverse]
+        except Exception as e:
+            print(f"Sentiment analysis error: {e}")
+            return [None] * len(texts)
+    
+    async def _classify_with_cohere(self, texts: List[str]) -> List[str]:
+        """Classify one chunk of texts with the Cohere API."""
+        async with self._cohere_semaphore:
+            response = await self.cohere_async.classify(
+                inputs=texts,
+                examples=SENTIMENT_EXAMPLES
+            )
+        return [c.prediction for c in response.classifications]
+    
+    def _map_sentiment_label(self, result: dict) -> str:
+        """Map a sentiment pipeline result to our categories."""
+        label = result['label'].lower()
+        score = result['score']
+        
+        if label == 'positive' and score > 0.6:
+            return 'positive'
+        elif label == 'negative' and score > 0.6:
+            return 'negative'
+        else:
+            return 'neutral'
     
     def extract_topic(self, text: str) -> str:
         """
@@ -82,28 +467,74 @@ class AIService:
         
         Returns: 'service', 'cleanliness', 'price', 'food', 'ambiance', or 'other'
         """
+        return self.extract_topic_batch([text])[0]
+    
+    def extract_topic_batch(self, texts: List[str]) -> List[str]:
+        """Extract the main topic for each text, in input order."""
+        keys, results, missing = self._cache_lookup(self._topic_cache, texts)
+        computed = self._extract_topics_uncached(list(missing.values()))
+        return self._cache_store(self._topic_cache, keys, results, dict(zip(missing, computed)))
+    
+    def _extract_topics_uncached(self, texts: List[str]) -> List[str]:
+        """Extract topics for texts without consulting the cache."""
+        return [self._match_topic(text) for text in texts]
+    
+    def _match_topic(self, text: str) -> str:
+        """Pick the topic whose keywords appear most in text."""
         text_lower = text.lower()
         
-        # Simple keyword-based classification
-        topics = {
-            'service': ['service', 'staff', 'waiter', 'waitress', 'employee', 'friendly', 'rude', 'helpful', 'slow'],
-            'cleanliness': ['clean', 'dirty', 'hygiene', 'sanitary', 'mess', 'spotless', 'filthy'],
-            'price': ['price', 'expensive', 'cheap', 'cost', 'value', 'overpriced', 'affordable', 'worth'],
-            'food': ['food', 'meal', 'dish', 'taste', 'delicious', 'bland', 'fresh', 'stale', 'menu'],
-            'ambiance': ['atmosphere', 'ambiance', 'decor', 'music', 'loud', 'quiet', 'cozy', 'comfortable']
-        }
-        
-        topic_scores = {}
-        for topic, keywords in topics.items():
-            score = sum(1 for keyword in keywords if keyword in text_lower)
-            if score > 0:
-                topic_scores[topic] = score
+        # Simple keyword-based classification: one automaton pass finds every
+        # keyword, including inside longer words ('prices', 'dishes'), and
+        # each distinct keyword scores one point for its topic
+        matched = {keyword for _, keyword in TOPIC_AUTOMATON.iter(text_lower)}
+        topic_scores = Counter(KEYWORD_TOPICS[keyword] for keyword in matched)
         
         if topic_scores:
-            return max(topic_scores, key=topic_scores.get)
+            return max(TOPIC_KEYWORDS, key=lambda topic: topic_scores[topic])
         return 'other'
     
-    def generate_reply(
+    def _cache_lookup(
+        self,
+        cache: OrderedDict,
+        texts: List[str]
+    ) -> Tuple[List[int], List[Optional[str]], Dict[int, str]]:
+        """
+        Look up per-text results in an LRU cache keyed by a 64-bit text hash.
+        
+        Returns: (keys, cached results or None, {key: text} for unique misses)
+        """
+        keys = [_text_key(text) for text in texts]
+        
+        with self._cache_lock:
+            results = [cache.get(key) for key in keys]
+        
+        missing = {}
+        for i, result in enumerate(results):
+            if result is None:
+                missing.setdefault(keys[i], texts[i])
+        
+        return keys, results, missing
+    
+    def _cache_store(
+        self,
+        cache: OrderedDict,
+        keys: List[int],
+        results: List[Optional[str]],
+        computed: Dict[int, Optional[str]]
+    ) -> List[Optional[str]]:
+        """Store freshly computed results (except None) and return the full result list."""
+        with self._cache_lock:
+            for key in keys:
+                if computed.get(key) is not None:
+                    cache[key] = computed[key]
+                elif key in cache:
+                    cache.move_to_end(key)
+            while len(cache) > settings.ai_cache_size:
+                cache.popitem(last=False)
+        
+        return [result if result is not None else computed[key] for result, key in zip(results, keys)]
+    
+    async def generate_reply(
         self,
         review_text: str,
         rating: int,
@@ -123,14 +554,14 @@ class AIService:
         
         if not self.use_local and settings.cohere_api_key:
             try:
-                return self._generate_with_cohere(sanitized_text, context, rating, sentiment)
+                return await self._generate_with_cohere(sanitized_text, context, rating, sentiment)
             except Exception as e:
                 print(f"Cohere generation error: {e}")
                 return self._generate_with_local(sanitized_text, context, rating, sentiment)
         else:
             return self._generate_with_local(sanitized_text, context, rating, sentiment)
     
-    def _generate_with_cohere(
+    async def _generate_with_cohere(
         self,
         text: str,
         context: str,
@@ -149,7 +580,7 @@ Write a professional, empathetic response (2-3 sentences). Be concise and warm.
 
 Response:"""
         
-        response = self.cohere_client.generate(
+        response = await self.cohere_async.generate(
             prompt=prompt,
             max_tokens=150,
             temperature=0.7,
@@ -169,24 +600,9 @@ Response:"""
         sentiment: str
     ) -> Tuple[str, str]:
         """Generate reply using local models or templates."""
-        # Template-based responses
-        templates = {
-            'positive': [
-                "Thank you so much for your wonderful feedback! We're thrilled to hear you had a great experience. We look forward to welcoming you back soon!",
-                "We're so glad you enjoyed your visit! Your kind words mean a lot to our team. Hope to see you again!",
-            ],
-            'negative': [
-                "We sincerely apologize for your disappointing experience. This is not the standard we aim for. Please contact us directly so we can make this right.",
-                "Thank you for bringing this to our attention. We're truly sorry for falling short of your expectations and would like the opportunity to improve your experience.",
-            ],
-            'neutral': [
-                "Thank you for taking the time to share your feedback. We appreciate your comments and are always working to improve. We hope to serve you better next time!",
-            ]
-        }
-        
         # Select template based on sentiment
-        import random
-        reply = random.choice(templates.get(sentiment, templates['neutral']))
+        templates = self._templates.get(sentiment) or self._templates['neutral']
+        reply = templates[randrange(len(templates))]
         
         reasoning = f"Generated using template-based approach for {sentiment} sentiment ({rating}-star rating)."
         
@@ -214,24 +630,22 @@ Response:"""
     
     def _sanitize_text(self, text: str) -> str:
         """Remove sensitive information from text."""
-        # Redact email addresses
-        text = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '[EMAIL]', text)
-        
-        # Redact phone numbers (various formats)
-        text = re.sub(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', '[PHONE]', text)
-        text = re.sub(r'\b\(\d{3}\)\s*\d{3}[-.]?\d{4}\b', '[PHONE]', text)
-        
-        return text
+        # Redact email addresses and phone numbers in a single pass
+        return self._SENSITIVE_RE.sub(self._redact, text)
+    
+    @staticmethod
+    def _redact(match: re.Match) -> str:
+        """Replacement for a sensitive-information match."""
+        return '[EMAIL]' if match.lastgroup == 'email' else '[PHONE]'
     
     def _fallback_sentiment(self, text: str) -> str:
         """Fallback sentiment analysis using simple keyword matching."""
         text_lower = text.lower()
         
-        positive_words = ['great', 'excellent', 'amazing', 'wonderful', 'love', 'best', 'fantastic', 'awesome']
-        negative_words = ['bad', 'terrible', 'worst', 'awful', 'horrible', 'poor', 'disappointing', 'hate']
-        
-        pos_count = sum(1 for word in positive_words if word in text_lower)
-        neg_count = sum(1 for word in negative_words if word in text_lower)
+        # Count distinct positive and negative words found in one pass
+        matched = {word for _, word in SENTIMENT_AUTOMATON.iter(text_lower)}
+        pos_count = len(matched & POSITIVE_WORDS)
+        neg_count = len(matched - POSITIVE_WORDS)
         
         if pos_count > neg_count:
             return 'positive'
@@ -8,14 +8,29 @@ class Settings(BaseSettings):
     # API Configuration
     api_key: str = "dev-secret-key-12345"
     database_url: str = "sqlite:///./reviews.db"
+    db_pool_size: int = 20
+    db_max_overflow: int = 40
     
     # AI Configuration
     cohere_api_key: Optional[str] = None
     use_local_model: bool = False
+    onnx_model_dir: str = "./onnx_models"
+    ai_cache_size: int = 4096
+    cohere_max_concurrency: int = 16
+    sentiment_batch_wait_ms: int = 10
+    fast_ingest: bool = False  # trust precomputed sentiment/topic on ingest (tests, backfills)
+    
+    # Search Configuration
+    search_index_path: str = "./search_index.joblib"
     
     # Server Configuration
     host: str = "0.0.0.0"
     port: int = 8000
+    # The search index lives in each worker process and only the worker that
+    # handled an ingest sees its reviews, so keep one worker until it's shared
+    workers: int = 1
+    inference_threads: Optional[int] = None  # default: CPU cores / workers
+    reload: bool = False
     
     # Pagination
     default_page_size: int = 20
@@ -1,15 +1,52 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text
+from sqlalchemy import create_engine, event, column, inspect, text, Column, DDL, Index, Integer, String, Float, DateTime, Text
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from datetime import datetime
+from typing import List
+import re
 from config import settings
 
+# Rows per INSERT statement when upserting reviews (9 bound parameters per row)
+UPSERT_CHUNK_SIZE = 100
+
+# Columns overwritten when an ingested review already exists
+UPSERT_COLUMNS = ("location", "rating", "text", "date", "sentiment", "topic", "updated_at")
+
 # Create SQLAlchemy engine
+database_url = make_url(settings.database_url)
+is_sqlite = database_url.get_backend_name() == "sqlite"
+in_memory = is_sqlite and (
+    database_url.database in (None, "", ":memory:") or database_url.query.get("mode") == "memory"
+)
+
+# In-memory SQLite uses a single shared connection, so there is no pool to size
+pool_options = {} if in_memory else {
+    "pool_size": settings.db_pool_size,
+    "max_overflow": settings.db_max_overflow,
+    "pool_pre_ping": True,
+}
+
 engine = create_engine(
     settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
+    connect_args={"check_same_thread": False} if is_sqlite else {},
+    **pool_options
 )
 
+if is_sqlite:
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        """Tune each SQLite connection for concurrent reads and fewer fsyncs."""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.close()
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -34,6 +71,51 @@ class Review(Base):
     # Metadata
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        # Covers the analytics GROUP BY queries, including the location filter
+        Index("ix_reviews_analytics", "location", "sentiment", "topic", "rating"),
+        # Serves newest-first listing and keyset pagination on (date, id)
+        Index("ix_reviews_date_id", date.desc(), id.desc()),
+    )
+
+
+# SQLite full-text index over review text, kept in sync by triggers
+REVIEWS_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS reviews_fts USING fts5(id UNINDEXED, text)",
+    """CREATE TRIGGER IF NOT EXISTS reviews_fts_insert AFTER INSERT ON reviews BEGIN
+        INSERT INTO reviews_fts(rowid, id, text) VALUES (new.rowid, new.id, new.text);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS reviews_fts_update AFTER UPDATE OF text ON reviews BEGIN
+        UPDATE reviews_fts SET text = new.text WHERE rowid = old.rowid;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS reviews_fts_delete AFTER DELETE ON reviews BEGIN
+        DELETE FROM reviews_fts WHERE rowid = old.rowid;
+    END""",
+]
+
+for statement in REVIEWS_FTS_DDL:
+    event.listen(Review.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(Review.__table__, "before_drop", DDL("DROP TABLE IF EXISTS reviews_fts").execute_if(dialect="sqlite"))
+
+
+def review_text_filter(db: Session, q: str):
+    """
+    Build a filter for reviews whose text contains the words in q.
+    
+    On SQLite this is answered from the FTS5 index (each word matched as a
+    prefix); other databases fall back to a LIKE substring scan.
+    """
+    terms = re.findall(r"\w+", q)
+    if db.get_bind().dialect.name != "sqlite" or not terms:
+        return Review.text.contains(q)
+    
+    match = " ".join(f'"{term}"*' for term in terms)
+    return Review.id.in_(
+        text("SELECT id FROM reviews_fts WHERE reviews_fts MATCH :match")
+        .bindparams(match=match)
+        .columns(column("id", String))
+    )
 
 
 # Dependency to get DB session
@@ -46,7 +128,69 @@ def get_db():
         db.close()
 
 
+def upsert_reviews(db: Session, rows: List[dict]):
+    """
+    Insert reviews, updating any that already exist.
+    
+    Uses INSERT ... ON CONFLICT (SQLite, PostgreSQL) or ON DUPLICATE KEY
+    UPDATE (MySQL, MariaDB), in chunks to stay under bound-parameter limits.
+    Other databases fall back to per-row ORM updates. If the same id appears
+    more than once, the last row wins.
+    """
+    rows = list({row["id"]: row for row in rows}.values())
+    if not rows:
+        return
+    
+    dialect = db.get_bind().dialect.name
+    if dialect not in ("sqlite", "postgresql", "mysql", "mariadb"):
+        _upsert_reviews_orm(db, rows)
+        return
+    
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        chunk = rows[start:start + UPSERT_CHUNK_SIZE]
+        if dialect in ("mysql", "mariadb"):
+            stmt = mysql_insert(Review).values(chunk)
+            stmt = stmt.on_duplicate_key_update({name: stmt.inserted[name] for name in UPSERT_COLUMNS})
+        else:
+            insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+            stmt = insert(Review).values(chunk)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Review.id],
+                set_={name: stmt.excluded[name] for name in UPSERT_COLUMNS}
+            )
+        db.execute(stmt)
+
+
+def _upsert_reviews_orm(db: Session, rows: List[dict]):
+    """Upsert reviews through the ORM, for databases without a native upsert."""
+    existing = {
+        review.id: review
+        for review in db.query(Review).filter(Review.id.in_([row["id"] for row in rows]))
+    }
+    for row in rows:
+        review = existing.get(row["id"])
+        if review is None:
+            db.add(Review(**row))
+        else:
+            for name in UPSERT_COLUMNS:
+                setattr(review, name, row[name])
+    
+    # Write now, like the native path, so later queries see these rows
+    db.flush()
+
+
 # Initialize database
 def init_db():
     """Initialize database tables."""
     Base.metadata.create_all(bind=engine)
+    
+    # create_all skips tables that already exist, so add any new indexes
+    for index in Review.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+    
+    # Likewise the FTS index, which is backfilled from existing reviews
+    if engine.dialect.name == "sqlite" and not inspect(engine).has_table("reviews_fts"):
+        with engine.begin() as conn:
+            for statement in REVIEWS_FTS_DDL:
+                conn.execute(text(statement))
+            conn.execute(text("INSERT INTO reviews_fts(rowid, id, text) SELECT rowid, id, text FROM reviews"))
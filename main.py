@@ -1,10 +1,12 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from contextlib import asynccontextmanager
 
 from database import init_db, get_db
 from routes import router
 from search_service import search_service
+from ai_service import ai_service
 
 
 @asynccontextmanager
@@ -16,16 +18,27 @@ async def lifespan(app: FastAPI):
     init_db()
     print("✓ Database initialized")
     
-    # Build search index
+    # Load search index (rebuilt if missing or stale)
     db = next(get_db())
     try:
-        search_service.index_reviews(db)
+        search_service.load_index(db)
     finally:
         db.close()
     
+    # Load local models in this worker and warm them up
+    ai_service.load_models()
+    await ai_service.warmup()
+    
+    # Coalesce concurrent sentiment requests into model batches
+    ai_service.start_batcher()
+    
     yield
     
     print("👋 Shutting down...")
+    await ai_service.stop_batcher()
+    
+    # Persist search index changes made since the last full re-index
+    search_service.save()
 
 
 # Create FastAPI app
@@ -36,6 +49,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Compress larger responses (review lists, analytics)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -73,5 +89,8 @@ if __name__ == "__main__":
         "main:app",
         host=settings.host,
         port=settings.port,
-        reload=True
+        workers=settings.workers,
+        reload=settings.reload,
+        loop="uvloop",
+        http="httptools"
     )
@@ -1,10 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, Header, Query
+from sqlalchemy import func, tuple_
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from datetime import datetime
+import asyncio
+import base64
 import math
 
-from database import get_db, Review
+from database import get_db, review_text_filter, upsert_reviews, Review
 from schemas import (
     IngestRequest, IngestResponse, ReviewResponse, ReviewListResponse,
     SuggestReplyResponse, AITags, AnalyticsResponse, SearchResponse,
@@ -24,6 +27,36 @@ def verify_api_key(x_api_key: str = Header(...)):
     return x_api_key
 
 
+def _review_response(review: Review) -> ReviewResponse:
+    """Build a ReviewResponse from a database row, skipping validation of trusted data."""
+    return ReviewResponse.model_construct(
+        id=review.id,
+        location=review.location,
+        rating=review.rating,
+        text=review.text,
+        date=review.date,
+        sentiment=review.sentiment,
+        topic=review.topic,
+        created_at=review.created_at,
+        updated_at=review.updated_at
+    )
+
+
+def _encode_cursor(review: Review) -> str:
+    """Encode the (date, id) position of a review as an opaque cursor."""
+    position = f"{review.date.isoformat()}|{review.id}"
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor produced by _encode_cursor."""
+    try:
+        date, review_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(date), review_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.post("/ingest", response_model=IngestResponse)
 async def ingest_reviews(
     request: IngestRequest,
@@ -34,48 +67,75 @@ async def ingest_reviews(
     Ingest a batch of reviews.
     
     Accepts an array of reviews and stores them in the database.
-    Also analyzes sentiment and topic for each review.
+    Also analyzes sentiment and topic for each review, unless FAST_INGEST
+    is enabled and the review carries precomputed tags.
     """
     try:
-        count = 0
-        for review_data in request.reviews:
-            # Check if review already exists
-            existing = db.query(Review).filter(Review.id == review_data.id).first()
-            
-            if existing:
-                # Update existing review
-                existing.location = review_data.location
-                existing.rating = review_data.rating
-                existing.text = review_data.text
-                existing.date = review_data.date
-                existing.updated_at = datetime.utcnow()
-                review = existing
+        # Reuse stored tags for existing reviews whose text is unchanged
+        existing = {
+            row.id: row
+            for row in db.query(Review.id, Review.text, Review.sentiment, Review.topic)
+            .filter(Review.id.in_([review_data.id for review_data in request.reviews]))
+        }
+        sentiments = [None] * len(request.reviews)
+        topics = [None] * len(request.reviews)
+        pending = []
+        for i, review_data in enumerate(request.reviews):
+            stored = existing.get(review_data.id)
+            if settings.fast_ingest and review_data.sentiment and review_data.topic:
+                sentiments[i] = review_data.sentiment
+                topics[i] = review_data.topic
+            elif stored and stored.text == review_data.text and stored.sentiment and stored.topic:
+                sentiments[i] = stored.sentiment
+                topics[i] = stored.topic
             else:
-                # Create new review
-                review = Review(
-                    id=review_data.id,
-                    location=review_data.location,
-                    rating=review_data.rating,
-                    text=review_data.text,
-                    date=review_data.date
-                )
-                db.add(review)
-            
-            # Analyze sentiment and topic
-            try:
-                review.sentiment = ai_service.analyze_sentiment(review_data.text)
-                review.topic = ai_service.extract_topic(review_data.text)
-            except Exception as e:
-                print(f"AI analysis error for review {review_data.id}: {e}")
-                review.sentiment = 'neutral'
-                review.topic = 'other'
-            
-            count += 1
+                pending.append(i)
+        
+        # Analyze sentiment and topic for the rest of the batch up front.
+        # Reviews the AI failed on are stored untagged (None), so the next
+        # ingest or suggest-reply retries them instead of keeping a guess.
+        texts = [request.reviews[i].text for i in pending]
+        try:
+            pending_sentiments = await ai_service.analyze_sentiment_batch(texts, fallback=False)
+            pending_topics = ai_service.extract_topic_batch(texts)
+        except Exception as e:
+            print(f"AI analysis error for ingest batch: {e}")
+            pending_sentiments = [None] * len(texts)
+            pending_topics = [None] * len(texts)
+        
+        for i, sentiment, topic in zip(pending, pending_sentiments, pending_topics):
+            sentiments[i] = sentiment
+            topics[i] = topic
+        
+        now = datetime.utcnow()
+        rows = [
+            {
+                "id": review_data.id,
+                "location": review_data.location,
+                "rating": review_data.rating,
+                "text": review_data.text,
+                "date": review_data.date,
+                "sentiment": sentiments[i],
+                "topic": topics[i],
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i, review_data in enumerate(request.reviews)
+        ]
+        
+        # Insert new reviews and update existing ones in bulk
+        upsert_reviews(db, rows)
+        count = len(rows)
         
         db.commit()
         
-        # Refresh search index
-        search_service.refresh_index(db)
+        # Add new and updated reviews to the search index
+        await asyncio.to_thread(
+            search_service.add_documents,
+            [row["id"] for row in rows],
+            [row["text"] for row in rows],
+            now
+        )
         
         return IngestResponse(
             success=True,
@@ -95,6 +155,7 @@ async def get_reviews(
     q: Optional[str] = Query(None, description="Text search query"),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor (overrides page)"),
     db: Session = Depends(get_db),
     api_key: str = Depends(verify_api_key)
 ):
@@ -102,6 +163,8 @@ async def get_reviews(
     Get reviews with filtering and pagination.
     
     Supports filtering by location, sentiment, and text search.
+    Pass next_cursor back as cursor to fetch the following page without
+    the cost of skipping over earlier rows.
     """
     # Build query
     query = db.query(Review)
@@ -114,25 +177,35 @@ async def get_reviews(
         query = query.filter(Review.sentiment == sentiment)
     
     if q:
-        # Simple text search
-        query = query.filter(Review.text.contains(q))
+        # Full-text search
+        query = query.filter(review_text_filter(db, q))
     
     # Get total count
     total = query.count()
     
-    # Apply pagination
-    offset = (page - 1) * page_size
-    reviews = query.order_by(Review.date.desc()).offset(offset).limit(page_size).all()
+    # Apply pagination, fetching one extra row to detect a next page
+    query = query.order_by(Review.date.desc(), Review.id.desc())
+    if cursor:
+        query = query.filter(tuple_(Review.date, Review.id) < _decode_cursor(cursor))
+    else:
+        query = query.offset((page - 1) * page_size)
+    reviews = query.limit(page_size + 1).all()
+    
+    next_cursor = None
+    if len(reviews) > page_size:
+        reviews = reviews[:page_size]
+        next_cursor = _encode_cursor(reviews[-1])
     
     # Calculate total pages
     total_pages = math.ceil(total / page_size) if total > 0 else 0
     
     return ReviewListResponse(
-        reviews=[ReviewResponse.model_validate(r) for r in reviews],
+        reviews=[_review_response(r) for r in reviews],
         total=total,
         page=page,
         page_size=page_size,
-        total_pages=total_pages
+        total_pages=total_pages,
+        next_cursor=next_cursor
     )
 
 
@@ -167,29 +240,33 @@ async def suggest_reply(
     if not review:
         raise HTTPException(status_code=404, detail="Review not found")
     
-    # Ensure sentiment and topic are set
-    if not review.sentiment:
-        review.sentiment = ai_service.analyze_sentiment(review.text)
+    # Ensure sentiment and topic are set, saving both in one commit. If the
+    # AI fails the review stays untagged, and the reply uses the keyword
+    # classifier's guess without storing it.
+    if not review.sentiment or not review.topic:
+        if not review.sentiment:
+            review.sentiment = await ai_service.analyze_sentiment(review.text, fallback=False)
+        if not review.topic:
+            review.topic = ai_service.extract_topic(review.text)
         db.commit()
     
-    if not review.topic:
-        review.topic = ai_service.extract_topic(review.text)
-        db.commit()
+    sentiment = review.sentiment or ai_service._fallback_sentiment(review.text)
+    topic = review.topic or 'other'
     
     # Generate reply
     try:
-        reply_text, reasoning = ai_service.generate_reply(
+        reply_text, reasoning = await ai_service.generate_reply(
             review.text,
             review.rating,
-            review.sentiment,
-            review.topic
+            sentiment,
+            topic
         )
         
         return SuggestReplyResponse(
             reply=reply_text,
             tags=AITags(
-                sentiment=review.sentiment,
-                topic=review.topic
+                sentiment=sentiment,
+                topic=topic
             ),
             reasoning_log=reasoning
         )
@@ -203,17 +280,32 @@ async def suggest_reply(
 
 @router.get("/analytics", response_model=AnalyticsResponse)
 async def get_analytics(
+    location: Optional[str] = Query(None, description="Filter by location"),
+    start_date: Optional[datetime] = Query(None, description="Only reviews on or after this date"),
+    end_date: Optional[datetime] = Query(None, description="Only reviews on or before this date"),
     db: Session = Depends(get_db),
     api_key: str = Depends(verify_api_key)
 ):
     """
-    Get analytics data for all reviews.
+    Get analytics data for reviews.
     
     Returns counts by sentiment and topic, plus overall statistics.
+    Optionally restricted to a location and/or date range.
     """
-    reviews = db.query(Review).all()
+    # Build filters
+    filters = []
+    if location:
+        filters.append(Review.location == location)
+    if start_date:
+        filters.append(Review.date >= start_date)
+    if end_date:
+        filters.append(Review.date <= end_date)
+    
+    total_reviews, avg_rating = (
+        db.query(func.count(Review.id), func.avg(Review.rating)).filter(*filters).one()
+    )
     
-    if not reviews:
+    if not total_reviews:
         return AnalyticsResponse(
             sentiment_counts={},
             topic_counts={},
@@ -222,24 +314,25 @@ async def get_analytics(
         )
     
     # Count by sentiment
-    sentiment_counts = {}
-    for review in reviews:
-        sentiment = review.sentiment or 'unknown'
-        sentiment_counts[sentiment] = sentiment_counts.get(sentiment, 0) + 1
+    sentiment_counts = {
+        sentiment or 'unknown': count
+        for sentiment, count in (
+            db.query(Review.sentiment, func.count()).filter(*filters).group_by(Review.sentiment)
+        )
+    }
     
     # Count by topic
-    topic_counts = {}
-    for review in reviews:
-        topic = review.topic or 'unknown'
-        topic_counts[topic] = topic_counts.get(topic, 0) + 1
-    
-    # Calculate average rating
-    avg_rating = sum(r.rating for r in reviews) / len(reviews)
+    topic_counts = {
+        topic or 'unknown': count
+        for topic, count in (
+            db.query(Review.topic, func.count()).filter(*filters).group_by(Review.topic)
+        )
+    }
     
     return AnalyticsResponse(
         sentiment_counts=sentiment_counts,
         topic_counts=topic_counts,
-        total_reviews=len(reviews),
+        total_reviews=total_reviews,
         avg_rating=round(avg_rating, 2)
     )
 
@@ -256,20 +349,24 @@ async def search_reviews(
     
     Returns the top-k most similar reviews to the query.
     """
-    # Perform search
-    results = search_service.search(q, db, k)
+    # Perform search in a worker thread so scoring doesn't block the event loop
+    results = await asyncio.to_thread(search_service.search, q, db, k)
+    
+    # Fetch review details in one query, then restore ranked order
+    review_ids = [review_id for review_id, _ in results]
+    reviews_by_id = {
+        review.id: review
+        for review in db.query(Review).filter(Review.id.in_(review_ids))
+    } if review_ids else {}
     
-    # Fetch review details
-    search_results = []
-    for review_id, score in results:
-        review = db.query(Review).filter(Review.id == review_id).first()
-        if review:
-            search_results.append(
-                SearchResult(
-                    review=ReviewResponse.model_validate(review),
-                    similarity_score=round(score, 4)
-                )
-            )
+    search_results = [
+        SearchResult(
+            review=_review_response(reviews_by_id[review_id]),
+            similarity_score=round(score, 4)
+        )
+        for review_id, score in results
+        if review_id in reviews_by_id
+    ]
     
     return SearchResponse(
         results=search_results,
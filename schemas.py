@@ -14,7 +14,9 @@ class ReviewBase(BaseModel):
 
 class ReviewCreate(ReviewBase):
     """Schema for creating a review."""
-    pass
+    # Precomputed tags, only used when FAST_INGEST is enabled
+    sentiment: Optional[str] = None
+    topic: Optional[str] = None
 
 
 class ReviewInDB(ReviewBase):
@@ -65,6 +67,7 @@ class ReviewListResponse(BaseModel):
     page: int
     page_size: int
     total_pages: int
+    next_cursor: Optional[str] = None
 
 
 class AnalyticsResponse(BaseModel):
@@ -1,33 +1,110 @@
-from typing import List, Tuple
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from typing import List, Optional, Tuple
+from datetime import datetime
+from pathlib import Path
+import os
+import threading
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+import joblib
 import numpy as np
+import scipy.sparse as sp
 from database import Review
+from sqlalchemy import func
 from sqlalchemy.orm import Session
+from config import settings
+
+
+# Refit IDF weights once the index has grown this much since the last fit
+REFIT_GROWTH = 1.5
 
 
 class SearchService:
     """Service for TF-IDF based similarity search."""
     
-    def __init__(self):
-        """Initialize search service."""
-        self.vectorizer = TfidfVectorizer(
-            max_features=1000,
+    def __init__(self, index_path: str = settings.search_index_path):
+        """
+        Initialize search service.
+        
+        Args:
+            index_path: File the index is persisted to ('' disables persistence)
+        """
+        # Hashing is stateless, so new reviews can be vectorized without refitting
+        self.vectorizer = HashingVectorizer(
+            n_features=2**18,
             stop_words='english',
             ngram_range=(1, 2),
-            min_df=1
+            alternate_sign=False,
+            norm=None
         )
+        self.transformer = None
         self.review_vectors = None
         self.review_ids = []
+        self.fitted_count = 0  # documents the IDF weights were fitted on
+        self.last_updated_at = None  # newest review update in the index; None if unknown
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        
+        # Vectors added since the last search, merged in by search()
+        self._pending_ids = []
+        self._pending_vectors = []
+        self._dirty = False
+        
+        # Documents added while index_reviews() runs, replayed after the swap
+        self._rebuild_documents = None
+    
+    def load_index(self, db: Session):
+        """
+        Load the persisted index, rebuilding it if missing or out of date.
+        
+        Args:
+            db: Database session
+        """
+        if self.index_path and Path(self.index_path).exists():
+            try:
+                state = joblib.load(self.index_path)
+                review_count, last_updated_at = self._fingerprint(db)
+                if state.get('fingerprint') == (review_count, last_updated_at):
+                    with self._lock:
+                        self.transformer = state['transformer']
+                        self.review_vectors = state['review_vectors']
+                        self.review_ids = state['review_ids']
+                        self.fitted_count = state['fitted_count']
+                        self.last_updated_at = last_updated_at
+                        self._pending_ids = []
+                        self._pending_vectors = []
+                        self._dirty = False
+                    print(f"✓ Loaded search index with {review_count} reviews")
+                    return
+            except Exception as e:
+                print(f"Error loading search index: {e}")
+        
+        self.index_reviews(db)
     
     def index_reviews(self, db: Session):
         """
         Build TF-IDF index from all reviews in database.
         
+        Documents passed to add_documents() while the database is being read
+        are kept and re-vectorized with the new IDF weights.
+        
         Args:
             db: Database session
         """
-        reviews = db.query(Review).all()
+        with self._rebuild_lock:
+            with self._lock:
+                self._rebuild_documents = {}
+            try:
+                self._index_reviews(db)
+            finally:
+                with self._lock:
+                    self._rebuild_documents = None
+    
+    def _index_reviews(self, db: Session):
+        """Fit and swap in a new index (caller holds _rebuild_lock)."""
+        # Read the fingerprint first, so a write racing the read below
+        # makes the saved index look stale rather than current
+        _, last_updated_at = self._fingerprint(db)
+        reviews = db.query(Review.id, Review.text).all()
         
         if not reviews:
             print("No reviews to index")
@@ -35,16 +112,80 @@ class SearchService:
         
         # Extract texts and IDs
         texts = [review.text for review in reviews]
-        self.review_ids = [review.id for review in reviews]
+        review_ids = [review.id for review in reviews]
         
         # Build TF-IDF vectors
         try:
-            self.review_vectors = self.vectorizer.fit_transform(texts)
+            transformer = TfidfTransformer(norm='l2')
+            review_vectors = transformer.fit_transform(self.vectorizer.transform(texts))
+            with self._lock:
+                self.transformer = transformer
+                self.review_vectors = review_vectors
+                self.review_ids = review_ids
+                self.fitted_count = len(review_ids)
+                self.last_updated_at = last_updated_at
+                
+                # Replay documents added since the read with the new weights
+                documents = self._rebuild_documents
+                if documents:
+                    self._pending_ids = list(documents)
+                    self._pending_vectors = [self._vectorize(list(documents.values()))]
+                    self.last_updated_at = None
+                else:
+                    self._pending_ids = []
+                    self._pending_vectors = []
+                self._dirty = True
+            self.save()
             print(f"✓ Indexed {len(reviews)} reviews for search")
         except Exception as e:
             print(f"Error indexing reviews: {e}")
             self.review_vectors = None
     
+    def add_documents(
+        self,
+        review_ids: List[str],
+        texts: List[str],
+        updated_at: Optional[datetime] = None
+    ):
+        """
+        Add or replace reviews in the index without re-indexing the corpus.
+        
+        Only the new texts are vectorized here; they are merged into the
+        index by the next search, and IDF weights are refit once the index
+        grows by REFIT_GROWTH. Does nothing if no index has been built yet;
+        the next search builds it from the database.
+        
+        Args:
+            review_ids: IDs of the new or updated reviews
+            texts: Review texts, aligned with review_ids
+            updated_at: updated_at the rows were written with; if omitted,
+                the saved index is treated as stale on the next load
+        """
+        documents = dict(zip(review_ids, texts))
+        if not documents:
+            return
+        
+        with self._lock:
+            if self._rebuild_documents is not None:
+                self._rebuild_documents.update(documents)
+        
+        if self.review_vectors is None:
+            return
+        
+        try:
+            new_vectors = self._vectorize(list(documents.values()))
+            
+            with self._lock:
+                self._pending_ids.extend(documents)
+                self._pending_vectors.append(new_vectors)
+                if updated_at is None or self.last_updated_at is None:
+                    self.last_updated_at = None
+                else:
+                    self.last_updated_at = max(self.last_updated_at, updated_at)
+                self._dirty = True
+        except Exception as e:
+            print(f"Error updating search index: {e}")
+    
     def search(
         self,
         query: str,
@@ -58,7 +199,7 @@ class SearchService:
             query: Search query text
             db: Database session
             k: Number of results to return
-            
+        
         Returns:
             List of (review_id, similarity_score) tuples
         """
@@ -66,35 +207,128 @@ class SearchService:
         if self.review_vectors is None:
             self.index_reviews(db)
         
-        if self.review_vectors is None or len(self.review_ids) == 0:
+        with self._lock:
+            self._merge_pending()
+            grown = len(self.review_ids) > self.fitted_count * REFIT_GROWTH
+        
+        # Refit IDF weights on the grown corpus
+        if grown:
+            self.index_reviews(db)
+        
+        with self._lock:
+            review_vectors = self.review_vectors
+            review_ids = self.review_ids
+        
+        if review_vectors is None or len(review_ids) == 0:
             return []
         
         try:
             # Transform query to TF-IDF vector
-            query_vector = self.vectorizer.transform([query])
+            query_vector = self._vectorize([query])
             
-            # Calculate cosine similarity
-            similarities = cosine_similarity(query_vector, self.review_vectors)[0]
+            # Vectors are L2-normalized by the TfidfTransformer, so cosine
+            # similarity is a sparse dot product
+            similarities = (review_vectors @ query_vector.T).toarray().ravel()
             
-            # Get top k results
-            top_indices = np.argsort(similarities)[::-1][:k]
+            # Get top k results: partial selection, then sort only those k
+            if len(similarities) > k:
+                top_indices = np.argpartition(-similarities, k)[:k]
+                top_indices = top_indices[np.argsort(-similarities[top_indices])]
+            else:
+                top_indices = np.argsort(-similarities)
             
             # Filter out results with very low similarity
-            results = []
-            for idx in top_indices:
-                score = similarities[idx]
-                if score > 0.01:  # Minimum similarity threshold
-                    results.append((self.review_ids[idx], float(score)))
-            
-            return results
+            top_indices = top_indices[similarities[top_indices] > 0.01]  # Minimum similarity threshold
             
+            return [(review_ids[idx], float(similarities[idx])) for idx in top_indices]
+        
         except Exception as e:
             print(f"Search error: {e}")
             return []
     
+    def reset(self):
+        """Drop the in-memory index; the next search rebuilds it from the database."""
+        with self._lock:
+            self.transformer = None
+            self.review_vectors = None
+            self.review_ids = []
+            self.fitted_count = 0
+            self.last_updated_at = None
+            self._pending_ids = []
+            self._pending_vectors = []
+            self._dirty = False
+    
     def refresh_index(self, db: Session):
         """Refresh the search index with latest reviews."""
         self.index_reviews(db)
+    
+    def _fingerprint(self, db: Session) -> Tuple[int, Optional[datetime]]:
+        """Review count and newest updated_at, used to tell if a saved index is current."""
+        review_count, last_updated_at = db.query(
+            func.count(Review.id), func.max(Review.updated_at)
+        ).one()
+        return review_count, last_updated_at
+    
+    def _vectorize(self, texts: List[str]):
+        """Convert texts to TF-IDF vectors using the fitted IDF weights."""
+        return self.transformer.transform(self.vectorizer.transform(texts))
+    
+    def _merge_pending(self):
+        """Fold documents added since the last search into the index (caller holds _lock)."""
+        if not self._pending_ids:
+            return
+        
+        # Later additions of the same review win
+        latest = {review_id: row for row, review_id in enumerate(self._pending_ids)}
+        new_vectors = sp.vstack(self._pending_vectors, format='csr')[list(latest.values())]
+        
+        # Drop stale rows for reviews being replaced
+        keep = [i for i, review_id in enumerate(self.review_ids) if review_id not in latest]
+        vectors = self.review_vectors
+        ids = self.review_ids
+        if len(keep) < len(ids):
+            vectors = vectors[keep]
+            ids = [ids[i] for i in keep]
+        
+        self.review_vectors = sp.vstack([vectors, new_vectors], format='csr')
+        self.review_ids = ids + list(latest)
+        self._pending_ids = []
+        self._pending_vectors = []
+    
+    def save(self):
+        """
+        Persist the index to disk if it changed since the last save.
+        
+        Called after full re-indexes and at shutdown rather than on every
+        ingest. The index is stored with a (review count, newest updated_at)
+        fingerprint; load_index() rebuilds whenever the database no longer
+        matches it, including after ingests that were never saved.
+        """
+        if not self.index_path or not self._dirty:
+            return
+        
+        with self._lock:
+            self._merge_pending()
+            state = {
+                'transformer': self.transformer,
+                'review_vectors': self.review_vectors,
+                'review_ids': self.review_ids,
+                'fitted_count': self.fitted_count,
+                'fingerprint': (
+                    (len(self.review_ids), self.last_updated_at)
+                    if self.last_updated_at is not None else None
+                ),
+            }
+            self._dirty = False
+        try:
+            # Write to a temp file and swap it in, so concurrent savers and
+            # readers never see a partial file
+            tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            joblib.dump(state, tmp_path)
+            os.replace(tmp_path, self.index_path)
+        except Exception as e:
+            print(f"Error saving search index: {e}")
+            self._dirty = True
 
 
 # Global search service instance
@@ -0,0 +1,251 @@
+import os
+import pytest
+from contextlib import asynccontextmanager, contextmanager
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from datetime import datetime
+
+from main import app
+from database import Base, Review, get_db
+from config import settings
+import routes
+from search_service import SearchService, search_service
+from ai_service import ai_service
+
+# Test databases (in memory; StaticPool hands every checkout the same connection).
+# Read-only tests share a second database that is seeded once per session.
+# Names are per xdist worker, so the suite can run in parallel with `pytest -n auto`.
+WORKER = os.environ.get("PYTEST_XDIST_WORKER", "gw0")
+TEST_DATABASE_URL = f"sqlite+pysqlite:///file:testdb_{WORKER}?mode=memory&cache=shared&uri=true"
+SEEDED_DATABASE_URL = f"sqlite+pysqlite:///file:testdb_seeded_{WORKER}?mode=memory&cache=shared&uri=true"
+
+
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    """Stop pysqlite from managing transactions so SAVEPOINTs work."""
+    dbapi_connection.isolation_level = None
+
+
+def _set_test_pragmas(dbapi_connection, connection_record):
+    """Test data is disposable, so skip journaling and fsyncs."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA locking_mode=EXCLUSIVE")
+    cursor.close()
+
+
+def _begin_transaction(conn):
+    """Emit BEGIN ourselves, since pysqlite no longer does."""
+    conn.exec_driver_sql("BEGIN")
+
+
+def _create_test_engine(url):
+    """Create an in-memory test engine with the hooks above."""
+    test_engine = create_engine(
+        url,
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False, "uri": True}
+    )
+    event.listen(test_engine, "connect", _disable_pysqlite_transactions)
+    event.listen(test_engine, "connect", _set_test_pragmas)
+    event.listen(test_engine, "begin", _begin_transaction)
+    return test_engine
+
+
+engine = _create_test_engine(TEST_DATABASE_URL)
+seeded_engine = _create_test_engine(SEEDED_DATABASE_URL)
+
+# One client for the whole session; per-test state lives in db_session.
+# TestClient is itself a persistent httpx.Client; httpx's ASGITransport only
+# works with AsyncClient, which these synchronous tests can't use.
+_client = TestClient(app)
+_HEADERS = {"X-API-Key": settings.api_key}
+
+
+@asynccontextmanager
+async def _test_lifespan(app):
+    """App lifespan for tests: skip DB init, index loading and model warm-up."""
+    ai_service.start_batcher()
+    yield
+    await ai_service.stop_batcher()
+
+
+def seed_reviews(db, rows):
+    """Insert review dicts (as sent to /api/ingest) in one bulk INSERT."""
+    db.bulk_insert_mappings(Review, [
+        {**row, "date": datetime.fromisoformat(row["date"])}
+        for row in rows
+    ])
+    db.commit()
+
+
+@contextmanager
+def _rollback_session(bind):
+    """Session whose changes are rolled back on exit, even if it commits."""
+    connection = bind.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, autoflush=False, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+
+
+@contextmanager
+def _client_using(session):
+    """Point the app's database dependency at session while in use."""
+    def override_get_db():
+        """Override database dependency for testing."""
+        yield session
+    
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield _client
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def app_lifespan():
+    """Run the app's lifespan once per session on a single event loop."""
+    original = app.router.lifespan_context
+    app.router.lifespan_context = _test_lifespan
+    with _client:
+        yield
+    app.router.lifespan_context = original
+
+
+@pytest.fixture(scope="session", autouse=True)
+def fast_ingest():
+    """Store the precomputed tags in sample data instead of running the AI on ingest."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(settings, "fast_ingest", True)
+        yield
+
+
+@pytest.fixture(scope="session", autouse=True)
+def search_index_path(tmp_path_factory):
+    """Persist the search index to a per-worker temp file instead of the repo."""
+    original = search_service.index_path
+    search_service.index_path = str(tmp_path_factory.mktemp("search") / "search_index.joblib")
+    yield search_service.index_path
+    search_service.index_path = original
+
+
+@pytest.fixture(autouse=True)
+def stub_reply_generator(request, monkeypatch):
+    """Replace the reply generator with a canned reply unless the test is an integration test."""
+    if request.node.get_closest_marker("integration"):
+        return
+    
+    async def generate_reply(review_text, rating, sentiment, topic):
+        return "Thank you for your feedback!", "stubbed"
+    
+    monkeypatch.setattr(ai_service, "generate_reply", generate_reply)
+
+
+@pytest.fixture(scope="session")
+def db_engine():
+    """Create the test schema once per session; the database goes with the engine."""
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    # Closing the only connection frees the in-memory database, so no drop_all
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def seeded_db_engine(sample_reviews):
+    """Separate test database seeded with the sample reviews once per session."""
+    Base.metadata.create_all(bind=seeded_engine)
+    with Session(bind=seeded_engine, autoflush=False) as session:
+        seed_reviews(session, sample_reviews)
+        
+        # Fit the search index on this data once, rather than in the first search test
+        search_service.refresh_index(session)
+    
+    yield seeded_engine
+    seeded_engine.dispose()
+    search_service.reset()
+
+
+@pytest.fixture
+def db_session(db_engine):
+    """Database session whose changes are rolled back after each test."""
+    with _rollback_session(db_engine) as session:
+        yield session
+
+
+@pytest.fixture
+def sample_reviews_in_db(db_session, sample_reviews):
+    """Per-test session with the sample reviews already inserted."""
+    seed_reviews(db_session, sample_reviews)
+    return db_session
+
+
+@pytest.fixture
+def client(db_session, monkeypatch):
+    """
+    Create test client using the per-test database session.
+    
+    Routes get a fresh search index too, so ingests here can't change the
+    shared one the seeded search tests use.
+    """
+    monkeypatch.setattr(routes, "search_service", SearchService(index_path=""))
+    with _client_using(db_session) as client:
+        yield client
+
+
+@pytest.fixture
+def seeded_client(seeded_db_engine):
+    """Test client over the pre-seeded database; changes are rolled back."""
+    with _rollback_session(seeded_db_engine) as session, _client_using(session) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def headers():
+    """API headers with authentication (shared, never mutated)."""
+    return _HEADERS
+
+
+@pytest.fixture(scope="session")
+def sample_reviews():
+    """
+    Sample review data for testing (shared across tests, so a tuple).
+    
+    Carries the tags ingest would compute, so fast ingest can skip the AI.
+    """
+    return (
+        {
+            "id": "rev-001",
+            "location": "Downtown",
+            "rating": 5,
+            "text": "Amazing service! The staff was incredibly friendly and helpful.",
+            "date": "2026-01-15T10:00:00",
+            "sentiment": "positive",
+            "topic": "service"
+        },
+        {
+            "id": "rev-002",
+            "location": "Uptown",
+            "rating": 2,
+            "text": "Terrible experience. The place was dirty and service was slow.",
+            "date": "2026-01-16T14:30:00",
+            "sentiment": "negative",
+            "topic": "service"
+        },
+        {
+            "id": "rev-003",
+            "location": "Downtown",
+            "rating": 4,
+            "text": "Good food but a bit expensive for what you get.",
+            "date": "2026-01-17T12:00:00",
+            "sentiment": "neutral",
+            "topic": "price"
+        }
+    )
@@ -0,0 +1,167 @@
+import asyncio
+import random
+
+import pytest
+
+from ai_service import SENTIMENT_BATCH_SIZE, AIService, ai_service
+from config import settings
+
+
+# ===== Sentiment Tests =====
+
+def test_sentiment_fallback_not_cached(monkeypatch):
+    """Test that a failed API call is retried instead of answered from cache."""
+    calls = []
+    
+    async def classify(texts):
+        calls.append(texts)
+        if len(calls) == 1:
+            raise RuntimeError("Cohere unavailable")
+        return ["positive"] * len(texts)
+    
+    monkeypatch.setattr(ai_service, "use_local", False)
+    monkeypatch.setattr(ai_service, "_classify_with_cohere", classify)
+    text = "Fallback caching check: a lovely evening"
+    
+    assert asyncio.run(ai_service.analyze_sentiment_batch([text], fallback=False)) == [None]
+    assert asyncio.run(ai_service.analyze_sentiment_batch([text])) == ["positive"]
+    assert asyncio.run(ai_service.analyze_sentiment_batch([text])) == ["positive"]
+    assert len(calls) == 2
+
+
+def test_sentiment_fallback_uses_keywords(monkeypatch):
+    """Test that fallback=True answers with keyword sentiment when the API fails."""
+    async def classify(texts):
+        raise RuntimeError("Cohere unavailable")
+    
+    monkeypatch.setattr(ai_service, "use_local", False)
+    monkeypatch.setattr(ai_service, "_classify_with_cohere", classify)
+    
+    assert asyncio.run(ai_service.analyze_sentiment_batch(["Fallback check: terrible wait"])) == ["negative"]
+
+
+def test_local_sentiment_keeps_input_order():
+    """Test that length-bucketed local inference returns labels in input order."""
+    service = AIService()
+    service.sentiment_tokenizer = lambda texts, **kwargs: {'input_ids': [text.split() for text in texts]}
+    buckets = []
+    
+    def run_model(texts):
+        buckets.append([len(text.split()) for text in texts])
+        return [
+            {'label': 'POSITIVE' if text.startswith('good') else 'NEGATIVE', 'score': 0.9}
+            for text in texts
+        ]
+    
+    service._run_sentiment_model = run_model
+    
+    # Random mixed lengths and labels, so sorting reorders inputs across buckets
+    rng = random.Random(0)
+    positive = [rng.random() < 0.5 for _ in range(SENTIMENT_BATCH_SIZE * 2 + 5)]
+    texts = [('good ' if is_positive else 'bad ') + 'word ' * rng.randrange(40) for is_positive in positive]
+    
+    labels = service._analyze_sentiment_local(texts)
+    
+    assert labels == ['positive' if is_positive else 'negative' for is_positive in positive]
+    assert [len(bucket) for bucket in buckets] == [SENTIMENT_BATCH_SIZE, SENTIMENT_BATCH_SIZE, 5]
+    assert max(buckets[0]) <= min(buckets[1]) and max(buckets[1]) <= min(buckets[2])
+
+
+# ===== Sentiment Batcher Tests =====
+
+def _run_with_batcher(service, calls):
+    """Run coroutines from calls(service) concurrently while the batcher is running."""
+    async def run():
+        service.start_batcher()
+        try:
+            return await asyncio.gather(*calls(service), return_exceptions=True)
+        finally:
+            await service.stop_batcher()
+    
+    return asyncio.run(run())
+
+
+def test_batcher_coalesces_concurrent_calls():
+    """Test that concurrent analyze_sentiment calls run as one batch, in input order."""
+    service = AIService()
+    batches = []
+    
+    async def uncached(texts):
+        batches.append(list(texts))
+        return [None if text.endswith("3") else f"label {text}" for text in texts]
+    
+    service._analyze_sentiment_uncached = uncached
+    texts = [f"batcher check {i}" for i in range(5)]
+    
+    results = _run_with_batcher(service, lambda s: [s.analyze_sentiment(text) for text in texts])
+    
+    assert batches == [texts]
+    # Failed texts fall back to keyword sentiment
+    assert results == ["label batcher check 0", "label batcher check 1", "label batcher check 2",
+                       "neutral", "label batcher check 4"]
+
+
+def test_batcher_passes_errors_through():
+    """Test that a failing batch raises in every waiting caller."""
+    service = AIService()
+    
+    async def uncached(texts):
+        raise RuntimeError("model crashed")
+    
+    service._analyze_sentiment_uncached = uncached
+    
+    results = _run_with_batcher(service, lambda s: [s.analyze_sentiment(f"error check {i}") for i in range(3)])
+    
+    assert [type(result) for result in results] == [RuntimeError] * 3
+
+
+def test_stop_batcher_cancels_pending_calls():
+    """Test that stopping the batcher cancels in-flight and queued calls instead of hanging."""
+    service = AIService()
+    
+    async def uncached(texts):
+        await asyncio.Event().wait()  # never finishes
+    
+    service._analyze_sentiment_uncached = uncached
+    
+    async def run():
+        service.start_batcher()
+        # One more call than fits in a batch, so one stays queued
+        tasks = [
+            asyncio.create_task(service.analyze_sentiment(f"cancel check {i}"))
+            for i in range(SENTIMENT_BATCH_SIZE + 1)
+        ]
+        await asyncio.sleep(settings.sentiment_batch_wait_ms / 1000 * 2)
+        await service.stop_batcher()
+        return await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), timeout=1)
+    
+    results = asyncio.run(run())
+    
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+
+
+# ===== Keyword Classifier Tests =====
+
+@pytest.mark.parametrize("text,topic", [
+    ("Amazing service! The staff was incredibly friendly and helpful.", "service"),
+    ("The prices were high", "price"),  # keywords match inside words
+    ("Loved the dishes and the meals", "food"),
+    # Each distinct keyword scores once: service, slow vs dirty, filthy, mess
+    ("Slow, slow, slow service; dirty tables, filthy floors, a mess", "cleanliness"),
+    ("Good food but a bit expensive for what you get.", "price"),  # ties go to the earlier topic
+    ("Nothing to say", "other"),
+])
+def test_extract_topic(text, topic):
+    """Test keyword topic extraction."""
+    assert ai_service.extract_topic(text) == topic
+
+
+@pytest.mark.parametrize("text,sentiment", [
+    ("Loved it, the best night out", "positive"),
+    ("Great, great, great... but terrible and awful food", "negative"),  # distinct words count once
+    ("Bad parking, great coffee", "neutral"),
+    ("It was fine", "neutral"),
+])
+def test_fallback_sentiment(text, sentiment):
+    """Test keyword fallback sentiment."""
+    assert ai_service._fallback_sentiment(text) == sentiment
@@ -0,0 +1,37 @@
+from datetime import datetime
+
+import pytest
+
+from database import Review, upsert_reviews
+
+
+def _row(review_id, text):
+    """Review row as built by ingest."""
+    now = datetime(2026, 1, 20)
+    return {
+        "id": review_id,
+        "location": "Downtown",
+        "rating": 4,
+        "text": text,
+        "date": now,
+        "sentiment": "positive",
+        "topic": "food",
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+# ===== Upsert Tests =====
+
+@pytest.mark.parametrize("dialect", [None, "mssql"], ids=["native", "orm_fallback"])
+def test_upsert_reviews_inserts_and_updates(db_session, monkeypatch, dialect):
+    """Test that upsert inserts new reviews and updates existing ones, natively or via the ORM."""
+    if dialect:
+        monkeypatch.setattr(db_session.get_bind().dialect, "name", dialect)
+    
+    upsert_reviews(db_session, [_row("rev-100", "Fresh bread")])
+    upsert_reviews(db_session, [_row("rev-100", "Stale bread"), _row("rev-101", "Great soup")])
+    db_session.commit()
+    
+    texts = dict(db_session.query(Review.id, Review.text).filter(Review.id.in_(["rev-100", "rev-101"])))
+    assert texts == {"rev-100": "Stale bread", "rev-101": "Great soup"}
@@ -0,0 +1,98 @@
+from datetime import datetime
+
+import pytest
+
+from database import Review
+from search_service import SearchService
+
+
+def _add_review(db, review_id, text):
+    """Insert one review directly, as ingest would before updating the index."""
+    db.add(Review(id=review_id, location="Downtown", rating=4, text=text, date=datetime(2026, 1, 20)))
+    db.commit()
+
+
+# ===== Search Index Tests =====
+
+def test_add_documents_merged_on_search(sample_reviews_in_db):
+    """Test that added and replaced reviews show up in the next search."""
+    service = SearchService(index_path="")
+    service.index_reviews(sample_reviews_in_db)
+    
+    service.add_documents(["rev-001"], ["Cozy corner with quiet music"])
+    assert service.review_ids == ["rev-001", "rev-002", "rev-003"]  # merged lazily
+    
+    results = service.search("cozy music", sample_reviews_in_db)
+    assert [review_id for review_id, _ in results] == ["rev-001"]
+    assert sorted(service.review_ids) == ["rev-001", "rev-002", "rev-003"]
+
+
+def test_search_refits_after_corpus_growth(sample_reviews_in_db):
+    """Test that IDF weights are refit once the index grows past REFIT_GROWTH."""
+    service = SearchService(index_path="")
+    service.index_reviews(sample_reviews_in_db)
+    assert service.fitted_count == 3
+    
+    _add_review(sample_reviews_in_db, "rev-004", "Cozy corner with quiet music")
+    service.add_documents(["rev-004"], ["Cozy corner with quiet music"])
+    service.search("cozy", sample_reviews_in_db)
+    assert service.fitted_count == 3  # 4 reviews is below the refit threshold
+    
+    _add_review(sample_reviews_in_db, "rev-005", "Loud music all night")
+    service.add_documents(["rev-005"], ["Loud music all night"])
+    service.search("music", sample_reviews_in_db)
+    assert service.fitted_count == 5
+
+
+def test_save_only_when_changed(sample_reviews_in_db, tmp_path):
+    """Test that ingest updates are persisted by save(), not on every add."""
+    index_path = tmp_path / "index.joblib"
+    service = SearchService(index_path=str(index_path))
+    service.index_reviews(sample_reviews_in_db)
+    assert index_path.exists()
+    index_path.unlink()
+    
+    service.add_documents(["rev-001"], ["Updated review text"])
+    assert not index_path.exists()
+    
+    service.save()
+    assert index_path.exists()
+
+
+def test_load_index_rebuilds_after_text_update(sample_reviews_in_db, tmp_path, monkeypatch):
+    """Test that a saved index is reused only while the reviews are unchanged."""
+    index_path = str(tmp_path / "index.joblib")
+    SearchService(index_path=index_path).index_reviews(sample_reviews_in_db)
+    
+    service = SearchService(index_path=index_path)
+    with monkeypatch.context() as m:
+        m.setattr(service, "index_reviews", lambda db: pytest.fail("index was rebuilt"))
+        service.load_index(sample_reviews_in_db)
+    
+    # Same review count, different text
+    review = sample_reviews_in_db.get(Review, "rev-001")
+    review.text = "Cozy corner with quiet music"
+    sample_reviews_in_db.commit()
+    
+    service = SearchService(index_path=index_path)
+    service.load_index(sample_reviews_in_db)
+    results = service.search("cozy music", sample_reviews_in_db)
+    assert [review_id for review_id, _ in results] == ["rev-001"]
+
+
+def test_add_documents_during_rebuild_kept(sample_reviews_in_db):
+    """Test that documents added while index_reviews() reads the database survive the swap."""
+    service = SearchService(index_path="")
+    service.index_reviews(sample_reviews_in_db)
+    fingerprint = service._fingerprint
+    
+    def fingerprint_then_add(db):
+        result = fingerprint(db)
+        service.add_documents(["rev-001"], ["Cozy corner with quiet music"])
+        return result
+    
+    service._fingerprint = fingerprint_then_add
+    service.index_reviews(sample_reviews_in_db)
+    
+    results = service.search("cozy music", sample_reviews_in_db)
+    assert [review_id for review_id, _ in results] == ["rev-001"]